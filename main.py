@@ -1,6 +1,34 @@
 from abc import ABC, abstractmethod
+import asyncio
+import json
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+import aiohttp
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+ESEARCH_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi"
+ESUMMARY_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esummary.fcgi"
+
+# Ask for compressed responses explicitly — some proxies strip the default
+# header, and the gzipped esummary payload is a fraction of the size.
+REQUEST_HEADERS = {
+    "Accept-Encoding": "gzip, deflate",
+    "User-Agent": "citation_sleuth/1.0"
+}
+
+# NCBI allows 3 requests/second without an API key; cap in-flight requests accordingly.
+MAX_CONCURRENT_REQUESTS = 10
+
+# Keep the comma-joined id= query string comfortably within NCBI's URL limits.
+ESUMMARY_CHUNK_SIZE = 200
+
+# Article metadata is essentially immutable, so cache parsed summaries on disk
+# and skip the network entirely for PMIDs we have already seen.
+CACHE_PATH = "pubmed_cache.sqlite"
 
 class CitationSleuth(ABC):
     """
@@ -15,8 +43,8 @@ class CitationSleuth(ABC):
         format_top_usages_as_markdown(search_results: dict) -> str:
             Abstract method to format the search results into a markdown table.
 
-        update_object_docs(unity_catalog_object: str, markdown_table: str) -> None:
-            Abstract method to update the documentation of a Unity Catalog object with the generated markdown table.
+        update_object_docs(updates: dict) -> None:
+            Abstract method to update the documentation of Unity Catalog objects with generated markdown tables.
     """
 
     @abstractmethod
@@ -45,15 +73,14 @@ class CitationSleuth(ABC):
         """
         pass
 
-    @classmethod
-    def update_object_docs(self, unity_catalog_object: str, markdown_table: str) -> None:
+    @abstractmethod
+    def update_object_docs(self, updates: dict) -> None:
         """
-        Update the documentation of a Unity Catalog object with the generated markdown table.
-        
+        Update the documentation of Unity Catalog objects with generated markdown tables.
+
         Args:
-            unity_catalog_object (str): The Unity Catalog object (e.g., database, table) to update.
-            markdown_table (str): The markdown-formatted table to update the documentation with.
-        
+            updates (dict): Markdown documentation keyed by the full name of the Unity Catalog object to update.
+
         Returns:
             None
         """
@@ -72,10 +99,34 @@ class PubMedCitationSleuth(CitationSleuth):
         format_top_usages_as_markdown(search_results: dict) -> str:
             Formats the search results into a markdown table.
 
-        update_object_docs(unity_catalog_object: str, markdown_table: str) -> None:
-            Updates the documentation of a Unity Catalog object with the generated markdown table.
+        update_object_docs(updates: dict) -> None:
+            Updates the documentation of Unity Catalog objects with generated markdown tables.
     """
 
+    def __init__(self, api_key: str = None, email: str = None, cache_path: str = CACHE_PATH):
+        # An API key raises NCBI's rate limit from 3 to 10 requests/second; the
+        # email lets NCBI contact us instead of blocking if something misbehaves.
+        self.api_key = api_key if api_key is not None else os.environ.get("NCBI_API_KEY")
+        self.email = email if email is not None else os.environ.get("NCBI_EMAIL")
+        self._cache_path = cache_path
+        with sqlite3.connect(self._cache_path) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS articles "
+                "(article_id TEXT PRIMARY KEY, article_info TEXT)"
+            )
+        # Shared session for the threaded path, so connections to NCBI are kept alive
+        # across requests instead of paying a TCP+TLS handshake each time. Retries
+        # with backoff cover NCBI's throttling (429) and transient 5xx responses.
+        self._session = requests.Session()
+        self._session.headers.update(REQUEST_HEADERS)
+        retry = Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=[429, 500, 502, 503, 504]
+        )
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=retry)
+        self._session.mount("https://", adapter)
+
     def search_for_usages(self, data_source: str) -> dict:
         """
         Search PubMed for usages of the data source.
@@ -86,52 +137,238 @@ class PubMedCitationSleuth(CitationSleuth):
         Returns:
             dict: A dictionary containing pruned results that meet the high-value criteria.
         """
-        base_url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi"
-        params = {
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self._search(data_source))
+        # Already inside an event loop (e.g. a notebook), where asyncio.run would
+        # raise; fall back to overlapping the fetches with a thread pool instead.
+        return self._search_threaded(data_source)
+
+    async def _search(self, data_source: str) -> list:
+        """
+        Run the esearch query and fan out the esummary fetches on one event loop.
+
+        Args:
+            data_source (str): The data source to search for.
+
+        Returns:
+            list: A list of dictionaries, one per article found for the search term.
+        """
+        params = self._identify({
             "db": "pubmed",
             "term": data_source,
             "retmode": "json",
             "retmax": 20
-        }
-        response = requests.get(base_url, params=params)
+        })
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        async with aiohttp.ClientSession(headers=REQUEST_HEADERS) as session:
+            async with session.get(ESEARCH_URL, params=params) as response:
+                search_results = await response.json()
+
+            article_ids = search_results.get('esearchresult', {}).get('idlist', [])
+            cached = self._cache_get(article_ids)
+            missing = [aid for aid in article_ids if aid not in cached]
+            chunks = [missing[i:i + ESUMMARY_CHUNK_SIZE]
+                      for i in range(0, len(missing), ESUMMARY_CHUNK_SIZE)]
+            results = await asyncio.gather(
+                *[self.fetch_article_info(session, semaphore, chunk) for chunk in chunks]
+            )
+
+        return self._assemble_articles(article_ids, cached, results)
+
+    async def fetch_article_info(self, session: aiohttp.ClientSession,
+                                 semaphore: asyncio.Semaphore, article_ids: list) -> list:
+        """
+        Fetch detailed information about a batch of PubMed articles with a single esummary call.
+
+        Args:
+            session (aiohttp.ClientSession): The HTTP session shared across fetches.
+            semaphore (asyncio.Semaphore): Caps concurrent requests to respect NCBI rate limits.
+            article_ids (list): The PubMed IDs of the articles.
+
+        Returns:
+            list: A list of dictionaries, one per article, containing the article's title, publication date, DOI, PMC reference count, and a link to the article.
+        """
+        if not article_ids:
+            return []
+
+        params = self._identify({
+            "db": "pubmed",
+            "id": ",".join(article_ids),
+            "retmode": "json"
+        })
+        async with semaphore:
+            async with session.get(ESUMMARY_URL, params=params) as response:
+                payload = await response.json()
+
+        return self._parse_summary_json(payload)
+
+    def _search_threaded(self, data_source: str) -> list:
+        """
+        Synchronous twin of _search that overlaps fetches with a thread pool.
+
+        Args:
+            data_source (str): The data source to search for.
+
+        Returns:
+            list: A list of dictionaries, one per article found for the search term.
+        """
+        params = self._identify({
+            "db": "pubmed",
+            "term": data_source,
+            "retmode": "json",
+            "retmax": 20
+        })
+        response = self._session.get(ESEARCH_URL, params=params)
         search_results = response.json()
 
         article_ids = search_results.get('esearchresult', {}).get('idlist', [])
-        articles = []
+        cached = self._cache_get(article_ids)
+        missing = [aid for aid in article_ids if aid not in cached]
+        chunks = [missing[i:i + ESUMMARY_CHUNK_SIZE]
+                  for i in range(0, len(missing), ESUMMARY_CHUNK_SIZE)]
+        with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as executor:
+            results = list(executor.map(self._fetch_chunk, chunks))
+
+        return self._assemble_articles(article_ids, cached, results)
+
+    def _fetch_chunk(self, article_ids: list) -> list:
+        """
+        Fetch one chunk of article summaries over the shared requests session.
+
+        Args:
+            article_ids (list): The PubMed IDs of the articles in this chunk.
+
+        Returns:
+            list: A list of dictionaries, one per article in the chunk.
+        """
+        if not article_ids:
+            return []
+
+        params = self._identify({
+            "db": "pubmed",
+            "id": ",".join(article_ids),
+            "retmode": "json"
+        })
+        response = self._session.get(ESUMMARY_URL, params=params)
+
+        return self._parse_summary_json(response.json())
+
+    def _identify(self, params: dict) -> dict:
+        """
+        Extend E-utilities request parameters with our credentials, when set.
+
+        Args:
+            params (dict): The query parameters for an E-utilities request.
+
+        Returns:
+            dict: The same parameters with tool, api_key and email added.
+        """
+        params["tool"] = "citation_sleuth"
+        if self.api_key:
+            params["api_key"] = self.api_key
+        if self.email:
+            params["email"] = self.email
+
+        return params
+
+    def _assemble_articles(self, article_ids: list, cached: dict, chunk_results: list) -> list:
+        """
+        Merge cached and freshly fetched articles back into esearch relevance order.
+
+        Args:
+            article_ids (list): All PubMed IDs returned by esearch, in order.
+            cached (dict): Articles served from the cache, keyed by PubMed ID.
+            chunk_results (list): Lists of freshly fetched articles, one per chunk.
+
+        Returns:
+            list: A list of dictionaries, one per article, in esearch order.
+        """
+        fetched = []
+        for chunk_articles in chunk_results:
+            fetched.extend(chunk_articles)
+        if fetched:
+            self._cache_put(fetched)
+
+        found = dict(cached)
+        found.update((article['article_id'], article) for article in fetched)
+
+        return [found[article_id] for article_id in article_ids if article_id in found]
+
+    def _cache_get(self, article_ids: list) -> dict:
+        """
+        Look up previously fetched articles in the on-disk cache.
+
+        Args:
+            article_ids (list): The PubMed IDs to look up.
+
+        Returns:
+            dict: The cached articles keyed by PubMed ID; missing IDs are absent.
+        """
+        if not article_ids:
+            return {}
+
+        placeholders = ",".join("?" * len(article_ids))
+        with sqlite3.connect(self._cache_path) as conn:
+            rows = conn.execute(
+                f"SELECT article_id, article_info FROM articles WHERE article_id IN ({placeholders})",
+                article_ids
+            ).fetchall()
+
+        return {article_id: json.loads(article_info) for article_id, article_info in rows}
+
+    def _cache_put(self, articles: list) -> None:
+        """
+        Store freshly fetched articles in the on-disk cache.
+
+        Args:
+            articles (list): The article dictionaries to store.
+
+        Returns:
+            None
+        """
+        with sqlite3.connect(self._cache_path) as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO articles (article_id, article_info) VALUES (?, ?)",
+                [(article['article_id'], json.dumps(article)) for article in articles]
+            )
+
+    def _parse_summary_json(self, payload: dict) -> list:
+        """
+        Parse an esummary JSON response into a list of article dictionaries.
 
-        for article_id in article_ids:
-            article_info = self.fetch_article_info(article_id)
-            if article_info:
-                articles.append(article_info)
+        Args:
+            payload (dict): The decoded esummary response body.
 
-        return articles
+        Returns:
+            list: A list of dictionaries, one per article in the response.
+        """
+        result = payload.get('result', {})
 
-    def fetch_article_info(self, article_id: str) -> dict:
+        return [self._parse_summary(article_id, result.get(article_id, {}))
+                for article_id in result.get('uids', [])]
+
+    def _parse_summary(self, article_id: str, data: dict) -> dict:
         """
-        Fetch detailed information about a specific PubMed article.
+        Extract the fields of interest from a single esummary record.
 
         Args:
             article_id (str): The PubMed ID of the article.
+            data (dict): The esummary record for the article.
 
         Returns:
             dict: A dictionary containing the article's title, publication date, DOI, PMC reference count, and a link to the article.
         """
-        base_url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esummary.fcgi"
-        params = {
-            "db": "pubmed",
-            "id": article_id,
-            "retmode": "xml"
-        }
-        response = requests.get(base_url, params=params)
-        soup = BeautifulSoup(response.content, 'xml')
-        
-        title = soup.find('Item', {'Name': 'Title'}).text if soup.find('Item', {'Name': 'Title'}) else "N/A"
-        publication_date = soup.find('Item', {'Name': 'EPubDate'}).text if soup.find('Item', {'Name': 'EPubDate'}) else "N/A"
-        doi = soup.find('Item', {'Name': 'DOI'}).text if soup.find('Item', {'Name': 'DOI'}) else "N/A"
-        pmc_ref_count = soup.find('Item', {'Name': 'PmcRefCount'}).text if soup.find('Item', {'Name': 'PmcRefCount'}) else "N/A"
+        title = data.get('title') or "N/A"
+        publication_date = data.get('epubdate') or "N/A"
+        doi = next((aid['value'] for aid in data.get('articleids', [])
+                    if aid.get('idtype') == 'doi'), "N/A")
+        pmc_ref_count = data.get('pmcrefcount') or "N/A"
         pubmed_link = f"https://pubmed.ncbi.nlm.nih.gov/{article_id}/"
 
         return {
+            "article_id": article_id,
             "title": title,
             "publication_date": publication_date,
             "doi": doi,
@@ -149,39 +386,50 @@ class PubMedCitationSleuth(CitationSleuth):
         Returns:
             str: A markdown-formatted table of the top usages.
         """
-        markdown_table = "| Title | Publication Date | DOI | PMC Reference Count | PubMed Link |\n"
-        markdown_table += "|-------|-----------------|-----|---------------------|-------------|\n"
-        
-        for result in search_results:
-            markdown_table += f"| {result['title']} | {result['publication_date']} | {result['doi']} | {result['pmc_ref_count']} | [Link]({result['pubmed_link']}) |\n"
-        
-        return markdown_table
+        rows = [
+            "| Title | Publication Date | DOI | PMC Reference Count | PubMed Link |",
+            "|-------|-----------------|-----|---------------------|-------------|"
+        ]
+        rows.extend(
+            f"| {result['title']} | {result['publication_date']} | {result['doi']} | {result['pmc_ref_count']} | [Link]({result['pubmed_link']}) |"
+            for result in search_results
+        )
 
-    def update_object_docs(self, unity_catalog_object: str, markdown_table: str) -> None:
+        return "\n".join(rows) + "\n"
+
+    def update_object_docs(self, updates: dict) -> None:
         """
-        Update the documentation of a Unity Catalog object with the generated markdown table.
+        Update the documentation of Unity Catalog objects with generated markdown tables.
+
+        The Tables API sets a table's comment in a single update call per object,
+        so the only batching left to do is overlapping the per-table calls, which
+        are network-bound like the PubMed fetches.
 
         Args:
-            unity_catalog_object (str): The Unity Catalog object (e.g., database, table) to update.
-            markdown_table (str): The markdown-formatted table to update the documentation with.
+            updates (dict): Markdown documentation keyed by the full name of the Unity Catalog table (e.g. catalog.schema.table).
 
         Returns:
             None
         """
-        # This is a placeholder implementation. The actual implementation will depend on how the Unity Catalog documentation is managed.
-        # For instance, you could write the markdown_table to a specific section in a markdown file or database entry.
-        print(f"Updating documentation for {unity_catalog_object} with the following markdown table:\n")
-        print(markdown_table)
+        # Imported here so the SDK is only required when actually pushing docs.
+        from databricks.sdk import WorkspaceClient
+
+        workspace = WorkspaceClient()
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(
+                lambda update: workspace.tables.update(full_name=update[0], comment=update[1]),
+                updates.items()
+            ))
 
 # Example usage:
 # sleuth = PubMedCitationSleuth()
 # results = sleuth.search_for_usages("machine learning")
 # markdown = sleuth.format_top_usages_as_markdown(results)
-# sleuth.update_object_docs("Machine Learning Dataset", markdown)
+# sleuth.update_object_docs({"main.datasets.ml_dataset": markdown})
 
 if __name__ == "__main__":
     sleuth = PubMedCitationSleuth()
     results = sleuth.search_for_usages("medical expenditure panel survey (MEPS)")
     markdown = sleuth.format_top_usages_as_markdown(results)
     print(markdown)
-    # sleuth.update_object_docs("Machine Learning Dataset", markdown)
+    # sleuth.update_object_docs({"main.datasets.meps": markdown})